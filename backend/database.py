@@ -1,33 +1,67 @@
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
-
-def get_db_connection():
-    """Simple database connection for small apps"""
-    return psycopg2.connect(
-        os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/myapp"),
-        cursor_factory=RealDictCursor
+import asyncpg
+
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/myapp")
+
+# Shared connection pool (created in the FastAPI lifespan handler)
+pool = None
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS items (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
+"""
 
-def init_db():
-    """Initialize database tables"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    # Create your tables here
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS items (
-            id SERIAL PRIMARY KEY,
-            name VARCHAR(255) NOT NULL,
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+async def init_pool():
+    """Create the shared connection pool"""
+    global pool
+    if pool is None:
+        pool = await asyncpg.create_pool(
+            DATABASE_URL,
+            min_size=5,
+            max_size=15,
+            command_timeout=30
         )
-    """)
+    return pool
+
+async def close_pool():
+    """Close the shared connection pool"""
+    global pool
+    if pool is not None:
+        await pool.close()
+        pool = None
 
-    conn.commit()
-    cur.close()
-    conn.close()
+async def get_db():
+    """
+    FastAPI dependency that yields a pooled connection.
+
+    Usage:
+        @app.get("/items")
+        async def list_items(conn = Depends(get_db)):
+            rows = await conn.fetch("SELECT * FROM items")
+            return [dict(row) for row in rows]
+    """
+    async with pool.acquire() as conn:
+        yield conn
+
+async def init_db():
+    """Initialize database tables"""
+    async with pool.acquire() as conn:
+        # Create your tables here
+        await conn.execute(CREATE_TABLE_SQL)
     print("Database initialized")
 
 if __name__ == "__main__":
-    init_db()
+    import asyncio
+
+    async def _main():
+        await init_pool()
+        try:
+            await init_db()
+        finally:
+            await close_pool()
+
+    asyncio.run(_main())
@@ -1,36 +1,354 @@
 import os
-from openai import OpenAI
+import re
+import asyncio
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from functools import lru_cache
 
-# Initialize client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Clients are created on first use so importing this module doesn't load openai
+@lru_cache(maxsize=1)
+def _client():
+    """Sync client, for scripts"""
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+@lru_cache(maxsize=1)
+def _aclient():
+    """Async client, for request handlers"""
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# Upper bound on a single async API call so a hung upstream can't hold a request
+REQUEST_TIMEOUT = 30
 
 # Model selection (configure in .env)
 MODEL = os.getenv("AI_MODEL", "gpt-4o-mini")
 
-def simple_completion(prompt: str, max_tokens: int = 1000) -> str:
+# Static system prompt - always sent first so it forms a cacheable prefix
+DEFAULT_SYSTEM = "You are a helpful assistant."
+
+# Timestamps in the system prompt change the prefix on every call and defeat caching
+_TIMESTAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+
+# Local response cache (exact match on model + parameters + messages)
+CACHE_PATH = os.getenv("AI_CACHE_PATH", ".openai_cache.sqlite3")
+CACHE_TTL = int(os.getenv("AI_CACHE_TTL", "21600"))  # 6 hours
+
+# Semantic cache: near-duplicate prompts matched by embedding cosine similarity
+EMBEDDING_MODEL = os.getenv("AI_EMBEDDING_MODEL", "text-embedding-3-small")
+SEMANTIC_CACHE_PATH = os.getenv("AI_SEMANTIC_CACHE_PATH", ".openai_semantic_cache.npz")
+SEMANTIC_THRESHOLD = float(os.getenv("AI_SEMANTIC_THRESHOLD", "0.92"))
+
+_cache_conn = None
+_cache_lock = threading.Lock()
+
+_semantic_embeddings = None  # float32 [N, dim], rows L2-normalized
+_semantic_scopes = None      # str [N], embedding model + params/system hash per row
+_semantic_expires = None     # float64 [N], unix time each row expires (CACHE_TTL)
+_semantic_keys = []          # exact-cache key per row; the response itself lives in SQLite
+_semantic_lock = threading.Lock()
+
+def _cache_db() -> sqlite3.Connection:
+    """Open the cache database on first use"""
+    global _cache_conn
+    if _cache_conn is None:
+        _cache_conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _cache_conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        _cache_conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)"
+        )
+    return _cache_conn
+
+def _cache_key(messages: list, max_tokens: int, temperature: float) -> str:
+    payload = f"{MODEL}|{temperature}|{max_tokens}|{json.dumps(messages, sort_keys=True)}"
+    return hashlib.blake2b(payload.encode()).hexdigest()
+
+def _cache_get(key: str):
+    with _cache_lock:
+        row = _cache_db().execute(
+            "SELECT value FROM responses WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+    return row[0] if row else None
+
+def _cache_set(key: str, value: str):
+    with _cache_lock:
+        conn = _cache_db()
+        now = time.time()
+        # Evict expired rows so the cache file doesn't grow without bound
+        conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, now + CACHE_TTL)
+        )
+        conn.commit()
+
+def _load_semantic_cache():
+    """Load persisted embeddings on first use"""
+    global _semantic_embeddings, _semantic_scopes, _semantic_expires, _semantic_keys
+    if _semantic_scopes is not None:
+        return
+    _clear_semantic_cache()
+    if os.path.exists(SEMANTIC_CACHE_PATH):
+        data = np.load(SEMANTIC_CACHE_PATH)
+        # Files from older layouts (no expiry times or keys) are dropped
+        if "expires" in data.files and "keys" in data.files:
+            _semantic_embeddings = data["embeddings"]
+            _semantic_scopes = data["scopes"]
+            _semantic_expires = data["expires"]
+            _semantic_keys = data["keys"].tolist()
+        _prune_semantic_cache()
+
+def _clear_semantic_cache():
+    """Drop every row (caller holds _semantic_lock)"""
+    global _semantic_embeddings, _semantic_scopes, _semantic_expires, _semantic_keys
+    _semantic_embeddings = None
+    _semantic_scopes = np.array([], dtype=str)
+    _semantic_expires = np.array([], dtype=np.float64)
+    _semantic_keys = []
+
+def _prune_semantic_cache():
+    """Drop expired rows (caller holds _semantic_lock)"""
+    global _semantic_embeddings, _semantic_scopes, _semantic_expires, _semantic_keys
+    if _semantic_embeddings is None:
+        return
+    keep = _semantic_expires > time.time()
+    if keep.all():
+        return
+    if not keep.any():
+        _clear_semantic_cache()
+        return
+    _semantic_embeddings = _semantic_embeddings[keep]
+    _semantic_scopes = _semantic_scopes[keep]
+    _semantic_expires = _semantic_expires[keep]
+    _semantic_keys = [k for k, kept in zip(_semantic_keys, keep) if kept]
+
+def save_semantic_cache():
+    """Persist the semantic cache (called on app shutdown)"""
+    with _semantic_lock:
+        if _semantic_embeddings is None:
+            return
+        # Keys are fixed-length hashes, so the array has no padding to speak of
+        np.savez(
+            SEMANTIC_CACHE_PATH,
+            embeddings=_semantic_embeddings,
+            scopes=_semantic_scopes,
+            expires=_semantic_expires,
+            keys=np.array(_semantic_keys, dtype=str)
+        )
+
+def _normalize(embedding: list) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def _embed(text: str) -> np.ndarray:
+    return _normalize(_client().embeddings.create(model=EMBEDDING_MODEL, input=text).data[0].embedding)
+
+async def _aembed(text: str) -> np.ndarray:
+    response = await _aclient().embeddings.create(model=EMBEDDING_MODEL, input=text)
+    return _normalize(response.data[0].embedding)
+
+def _semantic_scope(messages: list, max_tokens: int, temperature: float) -> str:
+    """Rows only match within one embedding model and conversation prefix"""
+    return f"{EMBEDDING_MODEL}:{_cache_key(messages[:-1], max_tokens, temperature)}"
+
+def _semantic_get(scope: str, vector: np.ndarray):
+    """Return the exact-cache key of the row most similar to vector, if above threshold"""
+    with _semantic_lock:
+        _load_semantic_cache()
+        # Rows from an embedding model with another dimension can't match
+        if _semantic_embeddings is None or _semantic_embeddings.shape[1] != vector.shape[0]:
+            return None
+        # Dot product of normalized vectors = cosine similarity
+        sims = _semantic_embeddings @ vector
+        sims[(_semantic_scopes != scope) | (_semantic_expires <= time.time())] = -1.0
+        best = int(sims.argmax())
+        if sims[best] > SEMANTIC_THRESHOLD:
+            return _semantic_keys[best]
+    return None
+
+def _semantic_lookup(scope: str, vector: np.ndarray):
+    """Cached response for the most similar earlier prompt, if any"""
+    key = _semantic_get(scope, vector)
+    return _cache_get(key) if key is not None else None
+
+def _semantic_set(scope: str, vector: np.ndarray, key: str):
+    global _semantic_embeddings, _semantic_scopes, _semantic_expires
+    with _semantic_lock:
+        _load_semantic_cache()
+        if _semantic_embeddings is not None and _semantic_embeddings.shape[1] != vector.shape[0]:
+            # AI_EMBEDDING_MODEL changed: the old rows can never match again
+            _clear_semantic_cache()
+        # Expired rows are removed on insert, which keeps the matrix bounded
+        _prune_semantic_cache()
+        if _semantic_embeddings is None:
+            _semantic_embeddings = vector[np.newaxis, :]
+        else:
+            _semantic_embeddings = np.vstack([_semantic_embeddings, vector])
+        _semantic_scopes = np.append(_semantic_scopes, scope)
+        _semantic_expires = np.append(_semantic_expires, time.time() + CACHE_TTL)
+        _semantic_keys.append(key)
+
+def _prompt_cache_key(system: str, cache_key: str = None) -> str:
+    """Stable key that routes requests sharing a prefix to the same cache"""
+    return cache_key or hashlib.sha1(system.encode()).hexdigest()[:16]
+
+def _cached_create(
+    messages: list,
+    max_tokens: int,
+    temperature: float,
+    prompt_cache_key: str,
+    cache_stochastic: bool,
+    semantic: bool = False
+) -> str:
     """
-    Simple AI completion for small apps.
-    Supports multiple models via AI_MODEL env var.
+    Call the chat API through the local response cache.
+    Only deterministic calls (temperature 0) are cached unless cache_stochastic is set.
+    With semantic=True, an exact-match miss falls back to an embedding
+    similarity lookup on the last message, scoped to the preceding messages.
     """
-    response = client.chat.completions.create(
+    use_cache = temperature == 0 or cache_stochastic
+    vector = None
+    if use_cache:
+        key = _cache_key(messages, max_tokens, temperature)
+        if (hit := _cache_get(key)) is not None:
+            return hit
+        if semantic:
+            scope = _semantic_scope(messages, max_tokens, temperature)
+            vector = _embed(messages[-1]["content"])
+            if (hit := _semantic_lookup(scope, vector)) is not None:
+                return hit
+
+    response = _client().chat.completions.create(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}],
+        messages=messages,
         max_tokens=max_tokens,
-        temperature=0.7
+        temperature=temperature,
+        extra_body={"prompt_cache_key": prompt_cache_key}
+    )
+    content = response.choices[0].message.content
+
+    if use_cache and content is not None:
+        _cache_set(key, content)
+        if vector is not None:
+            _semantic_set(scope, vector, key)
+    return content
+
+async def _acached_create(
+    messages: list,
+    max_tokens: int,
+    temperature: float,
+    prompt_cache_key: str,
+    cache_stochastic: bool,
+    semantic: bool = False
+) -> str:
+    """Async version of _cached_create; cache access runs in worker threads"""
+    use_cache = temperature == 0 or cache_stochastic
+    vector = None
+    if use_cache:
+        key = _cache_key(messages, max_tokens, temperature)
+        if (hit := await asyncio.to_thread(_cache_get, key)) is not None:
+            return hit
+        if semantic:
+            scope = _semantic_scope(messages, max_tokens, temperature)
+            vector = await asyncio.wait_for(_aembed(messages[-1]["content"]), timeout=REQUEST_TIMEOUT)
+            if (hit := await asyncio.to_thread(_semantic_lookup, scope, vector)) is not None:
+                return hit
+
+    response = await asyncio.wait_for(
+        _aclient().chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            extra_body={"prompt_cache_key": prompt_cache_key}
+        ),
+        timeout=REQUEST_TIMEOUT
     )
-    return response.choices[0].message.content
+    content = response.choices[0].message.content
+
+    if use_cache and content is not None:
+        await asyncio.to_thread(_cache_set, key, content)
+        if vector is not None:
+            await asyncio.to_thread(_semantic_set, scope, vector, key)
+    return content
 
-def structured_chat(messages: list, max_tokens: int = 1000) -> str:
+def simple_completion(
+    prompt: str,
+    max_tokens: int = 1000,
+    *,
+    system: str = DEFAULT_SYSTEM,
+    cache_key: str = None,
+    temperature: float = 0.7,
+    cache_stochastic: bool = False
+) -> str:
+    """
+    Simple AI completion for small apps.
+    Supports multiple models via AI_MODEL env var.
+    Static system content goes first, the prompt last, for prompt caching.
+    """
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt}
+    ]
+    return _cached_create(
+        messages, max_tokens, temperature,
+        _prompt_cache_key(system, cache_key), cache_stochastic,
+        semantic=True
+    )
+
+async def asimple_completion(
+    prompt: str,
+    max_tokens: int = 1000,
+    *,
+    system: str = DEFAULT_SYSTEM,
+    cache_key: str = None,
+    temperature: float = 0.7,
+    cache_stochastic: bool = False
+) -> str:
+    """
+    Async version of simple_completion for use in request handlers.
+    Awaits the API instead of blocking the event loop.
+    """
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt}
+    ]
+    return await _acached_create(
+        messages, max_tokens, temperature,
+        _prompt_cache_key(system, cache_key), cache_stochastic,
+        semantic=True
+    )
+
+def structured_chat(
+    messages: list,
+    max_tokens: int = 1000,
+    *,
+    cache_key: str = None,
+    temperature: float = 0.7,
+    cache_stochastic: bool = False
+) -> str:
     """
     For more complex conversations with context.
+    The first message must be a static system prompt (no timestamps).
     """
-    response = client.chat.completions.create(
-        model=MODEL,
-        messages=messages,
-        max_tokens=max_tokens,
-        temperature=0.7
+    if not messages or messages[0].get("role") != "system":
+        raise ValueError("structured_chat requires a system message first")
+    system = messages[0].get("content", "")
+    if _TIMESTAMP_RE.search(system):
+        raise ValueError("System prompt must not contain timestamps - pass them in a later message")
+
+    return _cached_create(
+        messages, max_tokens, temperature,
+        _prompt_cache_key(system, cache_key), cache_stochastic
     )
-    return response.choices[0].message.content
 
 # Test function
 if __name__ == "__main__":
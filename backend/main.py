@@ -1,19 +1,29 @@
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
-from collections import defaultdict
-import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from collections import Counter
+from operator import itemgetter
+from contextlib import asynccontextmanager
 import os
+import re
+import time
+import heapq
+import json
+import anyio
+import orjson
 
 # Import logging infrastructure
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from shared_logging import get_logger, get_frontend_logger, setup_centralized_logging, get_json_log_path
+from shared_logging import get_logger, get_frontend_logger, setup_centralized_logging, get_json_log_path, tail_log_lines, read_request_lines, read_rotated_request_lines, flush_logs, json_byte_needle
 from backend.middleware.request_id import RequestIDMiddleware
+from backend.middleware.cors import PublicCORSMiddleware
+from backend import database
+from backend.gpt_service import asimple_completion, save_semantic_cache
 
 # Setup centralized logging on app startup
 setup_centralized_logging(log_level="INFO", console_output=True)
@@ -21,18 +31,32 @@ setup_centralized_logging(log_level="INFO", console_output=True)
 # Initialize logger for this module
 logger = get_logger(__name__, module='BACKEND')
 
-app = FastAPI(title="{{PROJECT_NAME}}", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the database pool on startup and close it on shutdown"""
+    await database.init_pool()
+    await database.init_db()
+    yield
+    try:
+        await database.close_pool()
+    finally:
+        save_semantic_cache()
+
+
+app = FastAPI(
+    title="{{PROJECT_NAME}}",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # Request ID middleware (must be first to ensure all logs have request_id)
 app.add_middleware(RequestIDMiddleware)
 
-# CORS for frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Restrict this in production
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS for frontend (open to all origins - restrict this in production by
+# switching to CORSMiddleware with an explicit allow_origins list)
+app.add_middleware(PublicCORSMiddleware)
 
 # Serve frontend static files
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
@@ -67,9 +91,8 @@ def health_check():
 @app.post("/api/generate")
 async def generate_text(prompt: str):
     """Example endpoint for AI generation"""
-    from gpt_service import simple_completion
     try:
-        result = simple_completion(prompt)
+        result = await asimple_completion(prompt)
         return {"response": result}
     except Exception as e:
         logger.error(f"Generation failed: {e}")
@@ -80,6 +103,10 @@ async def generate_text(prompt: str):
 # FRONTEND LOGGING ENDPOINT
 # =============================================================================
 
+# Context keys dropped from frontend logs
+_SENSITIVE_KEY_RE = re.compile(r'password|token|key|secret', re.IGNORECASE)
+
+
 @app.post("/api/log/frontend")
 async def log_frontend_event(log_entry: FrontendLogEntry):
     """
@@ -103,8 +130,13 @@ async def log_frontend_event(log_entry: FrontendLogEntry):
         if log_entry.context:
             # Sanitize context (remove sensitive data)
             safe_context = {k: v for k, v in log_entry.context.items()
-                          if not any(s in k.lower() for s in ['password', 'token', 'key', 'secret'])}
-            context_parts.append(f"Context: {json.dumps(safe_context)}")
+                          if not _SENSITIVE_KEY_RE.search(k)}
+            try:
+                context_json = orjson.dumps(safe_context).decode()
+            except TypeError:
+                # e.g. integers beyond 64 bits - the stdlib encoder handles these
+                context_json = json.dumps(safe_context)
+            context_parts.append(f"Context: {context_json}")
 
         full_message = f"{message}"
         if context_parts:
@@ -124,7 +156,7 @@ async def log_frontend_event(log_entry: FrontendLogEntry):
 
     except Exception as e:
         logger.error(f"Failed to process frontend log: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={"status": "error", "message": str(e)}
         )
@@ -134,6 +166,26 @@ async def log_frontend_event(log_entry: FrontendLogEntry):
 # AI DEBUG API ENDPOINTS
 # =============================================================================
 
+JSON_LOG_PATH = get_json_log_path()
+
+# Cached existence check: once the log file has been seen it is assumed to
+# stay (readers tolerate a rotation gap); a missing file is re-checked at most
+# every few seconds instead of on every request
+_JSON_LOG_RECHECK_SECONDS = 5
+_json_log_seen = False
+_json_log_checked_at = float('-inf')
+
+
+def _json_log_exists() -> bool:
+    global _json_log_seen, _json_log_checked_at
+    if not _json_log_seen:
+        now = time.monotonic()
+        if now - _json_log_checked_at >= _JSON_LOG_RECHECK_SECONDS:
+            _json_log_checked_at = now
+            _json_log_seen = JSON_LOG_PATH.exists()
+    return _json_log_seen
+
+
 @app.get("/api/debug/logs")
 async def get_debug_logs(
     last: int = Query(50, description="Number of log entries to return", le=1000),
@@ -142,7 +194,8 @@ async def get_debug_logs(
     module: Optional[str] = Query(None, description="Filter by module (BACKEND, FRONTEND, etc)"),
     search: Optional[str] = Query(None, description="Search in message text"),
     since_minutes: Optional[int] = Query(None, description="Only logs from last N minutes"),
-    include_summary: bool = Query(True, description="Include analysis summary")
+    include_summary: bool = Query(True, description="Include analysis summary"),
+    stream: bool = Query(False, description="Stream entries as NDJSON, newest first (no summary)")
 ):
     """
     AI-friendly log retrieval endpoint.
@@ -152,49 +205,30 @@ async def get_debug_logs(
     - GET /api/debug/logs?level=ERROR&last=20
     - GET /api/debug/logs?request_id=abc123
     - GET /api/debug/logs?since_minutes=30&include_summary=true
+    - GET /api/debug/logs?last=1000&stream=true
     """
-    json_log_path = get_json_log_path()
-
-    if not json_log_path.exists():
+    if not _json_log_exists():
         return {"logs": [], "count": 0, "message": "No logs found"}
 
-    logs = []
     cutoff_time = None
 
     if since_minutes:
         cutoff_time = (datetime.utcnow() - timedelta(minutes=since_minutes)).isoformat() + "Z"
 
-    try:
-        # Read and parse JSON logs (read from end for efficiency)
-        with open(json_log_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        # Process from newest to oldest
-        for line in reversed(lines):
-            if len(logs) >= last:
-                break
-
-            try:
-                entry = json.loads(line.strip())
-            except json.JSONDecodeError:
-                continue
-
-            # Apply filters
-            if cutoff_time and entry.get('ts', '') < cutoff_time:
-                continue
-            if level and entry.get('level', '').upper() != level.upper():
-                continue
-            if request_id and request_id not in entry.get('request_id', ''):
-                continue
-            if module and entry.get('module', '').upper() != module.upper():
-                continue
-            if search and search.lower() not in entry.get('msg', '').lower():
-                continue
-
-            logs.append(entry)
+    if stream:
+        # Raw log lines are already JSON - send them as they are read
+        # (Starlette iterates the sync generator in a worker thread)
+        lines = _iter_logs(JSON_LOG_PATH, last, level, request_id, module, search, cutoff_time)
+        return StreamingResponse(
+            (line + b"\n" for line, _ in lines),
+            media_type="application/x-ndjson"
+        )
 
-        # Reverse to chronological order
-        logs = list(reversed(logs))
+    try:
+        # File I/O runs in a worker thread so the event loop stays responsive
+        logs = await anyio.to_thread.run_sync(
+            _read_logs, JSON_LOG_PATH, last, level, request_id, module, search, cutoff_time
+        )
 
         response = {
             "logs": logs,
@@ -216,54 +250,127 @@ async def get_debug_logs(
 
     except Exception as e:
         logger.error(f"Failed to retrieve logs: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": str(e), "logs": []}
         )
 
 
+def _iter_logs(
+    json_log_path: Path,
+    last: int,
+    level: Optional[str],
+    request_id: Optional[str],
+    module: Optional[str],
+    search: Optional[str],
+    cutoff_time: Optional[str]
+):
+    """Yield up to `last` matching (raw_line, entry) pairs, newest first (blocking I/O)"""
+    flush_logs()
+    count = 0
+
+    # Byte patterns that any matching raw line must contain (level and
+    # module are compared case-insensitively, so against the uppercased line)
+    level_bytes = json_byte_needle(level.upper()) if level else None
+    module_bytes = json_byte_needle(module.upper()) if module else None
+    request_id_bytes = json_byte_needle(request_id) if request_id else None
+    search_bytes = json_byte_needle(search.lower()) if search else None
+
+    # Read backwards, newest to oldest, stopping once satisfied. With a cutoff
+    # the active file is bisected by timestamp so older lines are never read;
+    # rotated segments last written before the cutoff are never decompressed
+    # (lines the pre-checks reject never reach the ts break below).
+    since = None
+    if cutoff_time:
+        since = datetime.fromisoformat(cutoff_time.rstrip('Z')).replace(tzinfo=timezone.utc).timestamp()
+    for line in tail_log_lines(json_log_path, since_ts=cutoff_time, since=since):
+        if count >= last:
+            break
+
+        # Skip JSON parsing for lines that cannot match
+        if level_bytes or module_bytes:
+            line_upper = line.upper()
+            if level_bytes and level_bytes not in line_upper:
+                continue
+            if module_bytes and module_bytes not in line_upper:
+                continue
+        if request_id_bytes and request_id_bytes not in line:
+            continue
+        if search_bytes and search_bytes not in line.lower():
+            continue
+
+        try:
+            entry = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+
+        # Apply filters (entries are appended in time order, so stop at the cutoff)
+        if cutoff_time and entry.get('ts', '') < cutoff_time:
+            break
+        if level and entry.get('level', '').upper() != level.upper():
+            continue
+        if request_id and request_id not in entry.get('request_id', ''):
+            continue
+        if module and entry.get('module', '').upper() != module.upper():
+            continue
+        if search and search.lower() not in entry.get('msg', '').lower():
+            continue
+
+        count += 1
+        yield line, entry
+
+
+def _read_logs(*args) -> List[dict]:
+    """Return matching entries (see _iter_logs) in chronological order"""
+    logs = [entry for _, entry in _iter_logs(*args)]
+    logs.reverse()
+    return logs
+
+
 def _generate_log_summary(logs: List[dict]) -> dict:
     """Generate AI-friendly summary of logs"""
-    level_counts = defaultdict(int)
-    module_counts = defaultdict(int)
-    request_ids = set()
-    errors = []
-    slow_operations = []
-
-    for log in logs:
-        level_counts[log.get('level', 'UNKNOWN')] += 1
-        module_counts[log.get('module', 'UNKNOWN')] += 1
-
-        if log.get('request_id') and log['request_id'] != '----':
-            request_ids.add(log['request_id'])
-
-        if log.get('level') == 'ERROR':
-            errors.append({
-                'ts': log.get('ts'),
-                'msg': log.get('msg', '')[:200],
-                'module': log.get('module'),
-                'request_id': log.get('request_id'),
-                'exception': log.get('exception', {}).get('type') if isinstance(log.get('exception'), dict) else None
-            })
-
-        # Find slow operations
-        duration = log.get('duration_ms')
-        if duration and duration > 1000:
-            slow_operations.append({
-                'ts': log.get('ts'),
-                'operation': log.get('span_op'),
-                'duration_ms': duration,
-                'request_id': log.get('request_id')
-            })
+    # Counting, filtering and top-N selection run in C (Counter, comprehensions, heapq)
+    level_counts = Counter(log.get('level', 'UNKNOWN') for log in logs)
+    module_counts = Counter(log.get('module', 'UNKNOWN') for log in logs)
+    request_ids = {log.get('request_id') for log in logs}
+    request_ids.difference_update((None, '', '----'))
+
+    error_logs = [log for log in logs if log.get('level') == 'ERROR']
+    errors = [
+        {
+            'ts': log.get('ts'),
+            'msg': log.get('msg', '')[:200],
+            'module': log.get('module'),
+            'request_id': log.get('request_id'),
+            'exception': log.get('exception', {}).get('type') if isinstance(log.get('exception'), dict) else None
+        }
+        for log in error_logs[:5]
+    ]
+
+    # Find slow operations
+    slow_logs = heapq.nlargest(
+        5,
+        (log for log in logs if (log.get('duration_ms') or 0) > 1000),
+        key=itemgetter('duration_ms')
+    )
+    slow_operations = [
+        {
+            'ts': log.get('ts'),
+            'operation': log.get('span_op'),
+            'duration_ms': log['duration_ms'],
+            'request_id': log.get('request_id')
+        }
+        for log in slow_logs
+    ]
 
     return {
         "total_entries": len(logs),
         "level_distribution": dict(level_counts),
         "module_distribution": dict(module_counts),
         "unique_requests": len(request_ids),
-        "error_count": len(errors),
-        "recent_errors": errors[:5],
-        "slow_operations": sorted(slow_operations, key=lambda x: x.get('duration_ms', 0), reverse=True)[:5],
+        "error_count": len(error_logs),
+        "recent_errors": errors,
+        "slow_operations": slow_operations,
         "time_range": {
             "oldest": logs[0].get('ts') if logs else None,
             "newest": logs[-1].get('ts') if logs else None
@@ -277,22 +384,12 @@ async def get_request_trace(request_id: str):
     Get all logs for a specific request ID.
     Useful for tracing a complete request lifecycle.
     """
-    json_log_path = get_json_log_path()
-
-    if not json_log_path.exists():
+    if not _json_log_exists():
         return {"logs": [], "request_id": request_id, "message": "No logs found"}
 
-    logs = []
-
     try:
-        with open(json_log_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line.strip())
-                    if request_id in entry.get('request_id', ''):
-                        logs.append(entry)
-                except json.JSONDecodeError:
-                    continue
+        # File I/O runs in a worker thread so the event loop stays responsive
+        logs = await anyio.to_thread.run_sync(_read_request_logs, JSON_LOG_PATH, request_id)
 
         return {
             "request_id": request_id,
@@ -305,7 +402,39 @@ async def get_request_trace(request_id: str):
 
     except Exception as e:
         logger.error(f"Failed to retrieve request trace: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": str(e), "request_id": request_id}
         )
+
+
+def _read_request_logs(json_log_path: Path, request_id: str) -> List[dict]:
+    """Return all entries for a request ID (blocking I/O)"""
+    logs = []
+
+    flush_logs()
+
+    # Use the request_id index when available
+    lines = read_request_lines(request_id)
+    if lines is None:
+        # No index yet - fall back to a full scan
+        needle = request_id.encode()
+        try:
+            with open(json_log_path, 'rb') as f:
+                lines = [line for line in f if needle in line]
+        except FileNotFoundError:
+            # Mid-rotation: the active file is briefly absent
+            lines = []
+
+    # Earlier records of the request may have been rotated into .N.gz segments
+    lines = read_rotated_request_lines(request_id, found=bool(lines)) + lines
+
+    for line in lines:
+        try:
+            entry = orjson.loads(line)
+            if request_id in entry.get('request_id', ''):
+                logs.append(entry)
+        except orjson.JSONDecodeError:
+            continue
+
+    return logs
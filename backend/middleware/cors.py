@@ -0,0 +1,56 @@
+"""Open CORS Middleware - Allow any origin with precomputed headers"""
+
+# Same method list Starlette's CORSMiddleware sends for allow_methods=["*"]
+_ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+
+_ALLOW_ORIGIN_HEADER = (b"access-control-allow-origin", b"*")
+_PREFLIGHT_HEADERS = [
+    _ALLOW_ORIGIN_HEADER,
+    (b"access-control-allow-methods", _ALLOW_METHODS),
+    (b"access-control-max-age", b"600"),
+    (b"content-type", b"text/plain; charset=utf-8"),
+    (b"content-length", b"2"),
+]
+
+
+class PublicCORSMiddleware:
+    """
+    CORS for a fully open API (any origin, method and header, no credentials).
+
+    Equivalent to CORSMiddleware(allow_origins=["*"], allow_methods=["*"],
+    allow_headers=["*"]) but with no per-request origin matching: preflights
+    get a fixed response and other responses get one constant header.
+    For a restricted origin list, use fastapi.middleware.cors.CORSMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        if b"origin" not in headers:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and b"access-control-request-method" in headers:
+            preflight_headers = _PREFLIGHT_HEADERS
+            if b"access-control-request-headers" in headers:
+                # Allow whatever headers were requested
+                preflight_headers = [
+                    *_PREFLIGHT_HEADERS,
+                    (b"access-control-allow-headers", headers[b"access-control-request-headers"])
+                ]
+            await send({"type": "http.response.start", "status": 200, "headers": preflight_headers})
+            await send({"type": "http.response.body", "body": b"OK"})
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), _ALLOW_ORIGIN_HEADER]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
@@ -1,30 +1,57 @@
 """Request ID Middleware - Add unique IDs to all requests for tracing"""
-import uuid
+import secrets
+import itertools
 import contextvars
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 
 # Thread-safe storage for request ID
 _request_id_context = contextvars.ContextVar('request_id', default=None)
 
+# Request IDs are a counter plus a random per-process suffix: unique per
+# process with no syscall per request (trace IDs, not security tokens).
+# The counter comes first so truncated IDs (e.g. in view_logs) still differ.
+_request_id_suffix = secrets.token_hex(4)
+_request_id_counter = itertools.count()
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Middleware to add unique request IDs to all requests"""
 
-    async def dispatch(self, request: Request, call_next):
-        # Generate or extract request ID
-        request_id = request.headers.get('X-Request-ID', str(uuid.uuid4()))
+def _new_request_id() -> str:
+    return f"{next(_request_id_counter):08x}{_request_id_suffix}"
 
-        # Store in context for logging
-        _request_id_context.set(request_id)
 
-        # Process request
-        response = await call_next(request)
+class RequestIDMiddleware:
+    """
+    Middleware to add unique request IDs to all requests.
+
+    Implemented as plain ASGI (not BaseHTTPMiddleware) to avoid the extra
+    task and memory stream that BaseHTTPMiddleware adds to every request.
+    """
+
+    def __init__(self, app):
+        self.app = app
 
-        # Add request ID to response headers
-        response.headers['X-Request-ID'] = request_id
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        return response
+        # Generate or extract request ID
+        request_id = next(
+            (value.decode('latin-1') for key, value in scope["headers"] if key == b"x-request-id"),
+            None
+        ) or _new_request_id()
+        request_id_header = (b"x-request-id", request_id.encode('latin-1'))
+
+        async def send_with_request_id(message):
+            # Add request ID to response headers
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), request_id_header]
+            await send(message)
+
+        # Store in context for logging
+        token = _request_id_context.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _request_id_context.reset(token)
 
 
 def get_request_id() -> str:
@@ -12,11 +12,15 @@ Usage:
     python logs/ai_debug_summary.py --json
 """
 
-import json
+import sys
+import time
+import heapq
 import argparse
+import orjson
 from pathlib import Path
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import Counter, defaultdict
+from operator import itemgetter
 from typing import List, Dict, Any
 
 # Find project root and log directory
@@ -25,48 +29,44 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 LOG_DIR = PROJECT_ROOT / "logs"
 JSON_LOG_FILE = LOG_DIR / "application.jsonl"
 
+sys.path.insert(0, str(PROJECT_ROOT))
+from shared_logging import tail_log_lines
+
 
 def parse_logs(hours: int = 24, errors_only: bool = False) -> List[Dict[str, Any]]:
     """Parse JSON logs from the last N hours"""
-    if not JSON_LOG_FILE.exists():
-        return []
-
     cutoff = datetime.utcnow() - timedelta(hours=hours)
     cutoff_str = cutoff.isoformat() + "Z"
 
+    # Read newest to oldest and stop at the first entry older than the cutoff;
+    # the active file is bisected to the cutoff and rotated segments last
+    # written before the window are never decompressed
+    lines = tail_log_lines(JSON_LOG_FILE, since_ts=cutoff_str, since=time.time() - hours * 3600)
     logs = []
-    with open(JSON_LOG_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                entry = json.loads(line.strip())
-                if entry.get('ts', '') >= cutoff_str:
-                    if errors_only and entry.get('level') != 'ERROR':
-                        continue
-                    logs.append(entry)
-            except json.JSONDecodeError:
-                continue
-
+    for line in lines:
+        try:
+            entry = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        if entry.get('ts', '') < cutoff_str:
+            break
+        if errors_only and entry.get('level') != 'ERROR':
+            continue
+        logs.append(entry)
+
+    logs.reverse()
     return logs
 
 
-def analyze_errors(logs: List[Dict]) -> Dict[str, Any]:
-    """Analyze error patterns"""
-    errors = [log for log in logs if log.get('level') == 'ERROR']
-
-    # Group by exception type
-    by_exception = defaultdict(list)
-    for error in errors:
-        exc_type = error.get('exception', {}).get('type') or 'Unknown'
-        by_exception[exc_type].append(error)
-
-    # Group by module
-    by_module = defaultdict(int)
-    for error in errors:
-        by_module[error.get('module', 'Unknown')] += 1
+def analyze_errors(errors: List[Dict]) -> Dict[str, Any]:
+    """Analyze error patterns (errors: ERROR-level entries)"""
+    # Group by exception type and module
+    by_exception = Counter(error.get('exception', {}).get('type') or 'Unknown' for error in errors)
+    by_module = Counter(error.get('module', 'Unknown') for error in errors)
 
     return {
         "total_errors": len(errors),
-        "by_exception_type": {k: len(v) for k, v in by_exception.items()},
+        "by_exception_type": dict(by_exception),
         "by_module": dict(by_module),
         "recent_errors": [
             {
@@ -81,10 +81,8 @@ def analyze_errors(logs: List[Dict]) -> Dict[str, Any]:
     }
 
 
-def analyze_performance(logs: List[Dict]) -> Dict[str, Any]:
-    """Analyze performance from span logs"""
-    spans = [log for log in logs if log.get('span_op') and log.get('duration_ms')]
-
+def analyze_performance(spans: List[Dict]) -> Dict[str, Any]:
+    """Analyze performance (spans: entries with span_op and duration_ms)"""
     if not spans:
         return {"message": "No span data found"}
 
@@ -104,15 +102,19 @@ def analyze_performance(logs: List[Dict]) -> Dict[str, Any]:
         }
 
     # Find slow operations (> 2 seconds)
-    slow = [
-        {"operation": s['span_op'], "duration_ms": s['duration_ms'], "request_id": s.get('request_id')}
-        for s in spans if s['duration_ms'] > 2000
-    ]
+    slow = heapq.nlargest(
+        10,
+        (s for s in spans if s['duration_ms'] > 2000),
+        key=itemgetter('duration_ms')
+    )
 
     return {
         "total_spans": len(spans),
         "operations": stats,
-        "slow_operations": sorted(slow, key=lambda x: x['duration_ms'], reverse=True)[:10]
+        "slow_operations": [
+            {"operation": s['span_op'], "duration_ms": s['duration_ms'], "request_id": s.get('request_id')}
+            for s in slow
+        ]
     }
 
 
@@ -168,19 +170,27 @@ def generate_summary(hours: int = 24) -> Dict[str, Any]:
             "log_file_exists": JSON_LOG_FILE.exists()
         }
 
-    # Basic stats
-    level_counts = defaultdict(int)
-    module_counts = defaultdict(int)
+    # Basic stats, plus the error and span subsets, in a single pass
+    level_counts = Counter()
+    module_counts = Counter()
     request_ids = set()
+    errors = []
+    spans = []
 
     for log in logs:
-        level_counts[log.get('level', 'UNKNOWN')] += 1
+        level = log.get('level', 'UNKNOWN')
+        level_counts[level] += 1
         module_counts[log.get('module', 'UNKNOWN')] += 1
-        if log.get('request_id') and log['request_id'] != '----':
-            request_ids.add(log['request_id'])
+        request_ids.add(log.get('request_id'))
+        if level == 'ERROR':
+            errors.append(log)
+        if log.get('span_op') and log.get('duration_ms'):
+            spans.append(log)
+
+    request_ids.difference_update((None, '', '----'))
 
-    error_analysis = analyze_errors(logs)
-    performance = analyze_performance(logs)
+    error_analysis = analyze_errors(errors)
+    performance = analyze_performance(spans)
     suggestions = suggest_investigations(error_analysis)
 
     # Determine health status
@@ -231,7 +241,7 @@ def main():
     summary = generate_summary(hours=args.hours)
 
     if args.json:
-        print(json.dumps(summary, indent=2, default=str))
+        print(orjson.dumps(summary, option=orjson.OPT_INDENT_2, default=str).decode())
         return
 
     # Human-readable output
@@ -11,15 +11,22 @@ Usage:
     python logs/view_logs.py --search "keyword" # Search in messages
 """
 
+import re
+import sys
 import argparse
-import json
 import time
+import orjson
+from itertools import islice
 from pathlib import Path
 
 SCRIPT_DIR = Path(__file__).parent
 LOG_DIR = SCRIPT_DIR
 LOG_FILE = LOG_DIR / "application.log"
 JSON_LOG_FILE = LOG_DIR / "application.jsonl"
+JSON_ERROR_LOG_FILE = LOG_DIR / "application_errors.jsonl"
+
+sys.path.insert(0, str(SCRIPT_DIR.parent))
+from shared_logging import tail_lines, tail_log_lines, json_byte_needle
 
 # ANSI color codes
 COLORS = {
@@ -32,6 +39,9 @@ COLORS = {
     'DIM': '\033[2m',
 }
 
+# Level column of a text log line; one scan finds whichever level is present
+_LEVEL_RE = re.compile(rb"\| (ERROR|WARNING|INFO|DEBUG)\b")
+
 
 def colorize(text: str, level: str) -> str:
     """Apply color based on log level"""
@@ -39,27 +49,48 @@ def colorize(text: str, level: str) -> str:
     return f"{color}{text}{COLORS['RESET']}"
 
 
+def _is_caseless(text: str) -> bool:
+    """True for ASCII text without letters, which matches the same with or without lowercasing"""
+    return text.isascii() and text.lower() == text.upper()
+
+
 def view_text_logs(lines: int, level: str, request_id: str, search: str, follow: bool):
     """View traditional text log file"""
     if not LOG_FILE.exists():
         print(f"Log file not found: {LOG_FILE}")
         return
 
+    # Filters are prepared once and matched against raw bytes, so lines
+    # that are filtered out are never decoded
+    checks = []
+    if level:
+        level_token = f"| {level.upper()}".encode()
+        checks.append(lambda line: level_token in line)
+    if request_id:
+        request_id_bytes = request_id.encode()
+        checks.append(lambda line: request_id_bytes in line)
+    if search and _is_caseless(search):
+        # e.g. an ID or status code: no need to lowercase every line
+        search_bytes = search.encode()
+        checks.append(lambda line: search_bytes in line)
+    elif search and search.isascii():
+        # bytes.lower() only folds ASCII, which is all an ASCII needle needs
+        search_low = search.lower().encode()
+        checks.append(lambda line: search_low in line.lower())
+    elif search:
+        search_text = search.lower()
+        checks.append(lambda line: search_text in line.decode('utf-8', 'replace').lower())
+
     def print_filtered_lines(content: list):
-        for line in content:
+        for raw_line in content:
             # Apply filters
-            if level and f"| {level}" not in line.upper():
-                continue
-            if request_id and request_id not in line:
-                continue
-            if search and search.lower() not in line.lower():
+            if not all(check(raw_line) for check in checks):
                 continue
+            line = raw_line.decode('utf-8', 'replace')
 
             # Colorize output
-            for lvl in ['ERROR', 'WARNING', 'INFO', 'DEBUG']:
-                if f"| {lvl}" in line:
-                    line = colorize(line.rstrip(), lvl)
-                    break
+            if match := _LEVEL_RE.search(raw_line):
+                line = colorize(line.rstrip(), match.group(1).decode())
 
             print(line)
 
@@ -67,7 +98,7 @@ def view_text_logs(lines: int, level: str, request_id: str, search: str, follow:
         # Follow mode
         print(f"Following {LOG_FILE} (Ctrl+C to stop)...")
         try:
-            with open(LOG_FILE, 'r') as f:
+            with open(LOG_FILE, 'rb') as f:
                 # Go to end of file
                 f.seek(0, 2)
                 while True:
@@ -79,10 +110,10 @@ def view_text_logs(lines: int, level: str, request_id: str, search: str, follow:
         except KeyboardInterrupt:
             print("\nStopped following.")
     else:
-        # Read last N lines
-        with open(LOG_FILE, 'r') as f:
-            all_lines = f.readlines()
-            print_filtered_lines(all_lines[-lines:])
+        # Read last N lines from the end of the file, not the whole file
+        last_lines = list(islice(tail_lines(LOG_FILE), lines))
+        last_lines.reverse()
+        print_filtered_lines(last_lines)
 
 
 def view_json_logs(lines: int, level: str, request_id: str, search: str, follow: bool):
@@ -91,6 +122,11 @@ def view_json_logs(lines: int, level: str, request_id: str, search: str, follow:
         print(f"JSON log file not found: {JSON_LOG_FILE}")
         return
 
+    # Errors have their own much smaller file
+    log_file = JSON_LOG_FILE
+    if level and level.upper() == 'ERROR' and JSON_ERROR_LOG_FILE.exists():
+        log_file = JSON_ERROR_LOG_FILE
+
     def format_entry(entry: dict) -> str:
         """Format a JSON log entry for display"""
         ts = entry.get('ts', '')[:19]  # Trim to seconds
@@ -107,45 +143,71 @@ def view_json_logs(lines: int, level: str, request_id: str, search: str, follow:
         line = f"{ts} | {lvl:8} | [{module}] | {req_id} | {msg}"
         return colorize(line, lvl)
 
+    level_upper = level.upper() if level else None
+    search_low = search.lower() if search else None
+    search_caseless = bool(search) and _is_caseless(search)
+
     def should_include(entry: dict) -> bool:
         """Check if entry matches filters"""
-        if level and entry.get('level', '').upper() != level.upper():
+        if level_upper and entry.get('level', '').upper() != level_upper:
             return False
         if request_id and request_id not in entry.get('request_id', ''):
             return False
-        if search and search.lower() not in entry.get('msg', '').lower():
+        if search_low:
+            msg = entry.get('msg', '')
+            if search_low not in (msg if search_caseless else msg.lower()):
+                return False
+        return True
+
+    # Raw-byte pre-checks, so lines that cannot match are never parsed
+    level_bytes = json_byte_needle(level_upper) if level else None
+    request_id_bytes = json_byte_needle(request_id) if request_id else None
+    search_bytes = json_byte_needle(search_low) if search else None
+
+    def might_include(line: bytes) -> bool:
+        # The level is compared case-insensitively once parsed
+        if level_bytes and level_bytes not in line.upper():
+            return False
+        if request_id_bytes and request_id_bytes not in line:
+            return False
+        if search_bytes and search_bytes not in (line if search_caseless else line.lower()):
             return False
         return True
 
     if follow:
-        print(f"Following {JSON_LOG_FILE} (Ctrl+C to stop)...")
+        print(f"Following {log_file} (Ctrl+C to stop)...")
         try:
-            with open(JSON_LOG_FILE, 'r') as f:
+            with open(log_file, 'rb') as f:
                 f.seek(0, 2)
                 while True:
                     line = f.readline()
                     if line:
+                        if not might_include(line):
+                            continue
                         try:
-                            entry = json.loads(line.strip())
+                            entry = orjson.loads(line)
                             if should_include(entry):
                                 print(format_entry(entry))
-                        except json.JSONDecodeError:
+                        except orjson.JSONDecodeError:
                             pass
                     else:
                         time.sleep(0.1)
         except KeyboardInterrupt:
             print("\nStopped following.")
     else:
-        with open(JSON_LOG_FILE, 'r') as f:
-            all_lines = f.readlines()
+        # Read extra in case of filtering; only the tail of the log is read
+        last_lines = list(islice(tail_log_lines(log_file), lines * 2))
+        last_lines.reverse()
 
         entries = []
-        for line in all_lines[-lines * 2:]:  # Read extra in case of filtering
+        for line in last_lines:
+            if not might_include(line):
+                continue
             try:
-                entry = json.loads(line.strip())
+                entry = orjson.loads(line)
                 if should_include(entry):
                     entries.append(entry)
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 continue
 
         for entry in entries[-lines:]:
@@ -21,15 +21,30 @@ import logging
 import sys
 import json
 import time
-import uuid
-import traceback
-import inspect
+import os
+import re
+import mmap
+import gzip
+import shutil
+import queue
+import atexit
+import threading
 from pathlib import Path
-from datetime import datetime
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
 from contextlib import contextmanager
+from functools import lru_cache
 from typing import Optional, Any, Dict
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+try:
+    from backend.middleware.request_id import get_request_id as _get_request_id
+except ImportError:  # used outside the backend, e.g. by standalone scripts
+    _get_request_id = None
+
 # Central log directory at project root
 PROJECT_ROOT = Path(__file__).parent
 LOG_DIR = PROJECT_ROOT / "logs"
@@ -42,33 +57,95 @@ DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 # Track if logging has been initialized
 _initialized = False
-_loggers = {}
+
+# Records are queued by the calling thread and written by a listener thread
+_log_queue = None
+_listener = None
 
 # JSON log file path
 JSON_LOG_FILE = LOG_DIR / "application.jsonl"
 
+# ERROR+ records only, so error queries don't scan the full log
+JSON_ERROR_LOG_FILE = LOG_DIR / "application_errors.jsonl"
 
-class ModuleTagFilter(logging.Filter):
-    """Add module tag to log records"""
-    def __init__(self, module_tag='MAIN'):
-        super().__init__()
-        self.module_tag = module_tag
+# Sidecar index: one "request_id<TAB>byte_offset" line per JSON log record
+JSON_INDEX_FILE = LOG_DIR / "application.idx"
 
-    def filter(self, record):
-        record.module_tag = self.module_tag
-        return True
+# JSON log rotation: application.jsonl -> application.jsonl.1.gz, .2.gz, ...
+JSON_LOG_MAX_BYTES = 64 * 1024 * 1024
+JSON_LOG_BACKUP_COUNT = 10
+
+# Placeholder request IDs that are not worth indexing
+_UNINDEXED_REQUEST_IDS = ('----', 'no-request-id')
+
+# Local variable names whose values are never logged
+_SENSITIVE_RE = re.compile(r'password|token|key|secret|credential|auth', re.IGNORECASE)
+
+# Handlers have no formatException of their own
+_exception_formatter = logging.Formatter()
+
+
+def _json_line(entry: dict) -> bytes:
+    """Serialize a log entry as one UTF-8 JSON line (orjson when available)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                entry,
+                default=str,
+                option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+            )
+        except TypeError:
+            # e.g. integers beyond 64 bits - the stdlib encoder handles these
+            pass
+    return (json.dumps(entry, default=str) + '\n').encode('utf-8')
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+# Last formatted second, reused while records keep arriving within it
+_ts_cache = (None, '')
+
+
+def _iso_ts(created: float) -> str:
+    """Format a unix timestamp like datetime.utcnow().isoformat() + "Z" """
+    global _ts_cache
+    seconds = int(created)
+    cached_seconds, prefix = _ts_cache
+    if seconds != cached_seconds:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))
+        _ts_cache = (seconds, prefix)
+    return f"{prefix}.{int((created - seconds) * 1_000_000):06d}Z"
+
+
+class ModuleTagAdapter(logging.LoggerAdapter):
+    """Add module tag to log records (one adapter per module, so tags never collide)"""
+    def __init__(self, logger, module_tag='MAIN'):
+        super().__init__(logger, {'module_tag': module_tag})
+
+    def process(self, msg, kwargs):
+        # Merge rather than replace, so per-call extra (spans, context) survives
+        extra = kwargs.get('extra')
+        kwargs['extra'] = {**self.extra, **extra} if extra else self.extra
+        return msg, kwargs
+
+
+class _LazyJSON:
+    """Log argument rendered as JSON only if the record is actually emitted"""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return json.dumps(self.value, default=str)
 
 
 class RequestIDFilter(logging.Filter):
     """Add request_id to log records from context"""
     def filter(self, record):
-        # Try to get request ID from context (set by middleware)
-        try:
-            from backend.middleware.request_id import get_request_id
-            record.request_id = get_request_id()
-        except:
-            # If not in request context, use placeholder
-            record.request_id = '----'
+        # Request ID from context (set by middleware); placeholder without the backend
+        record.request_id = _get_request_id() if _get_request_id is not None else '----'
         return True
 
 
@@ -76,55 +153,204 @@ class JSONLineHandler(logging.Handler):
     """
     Handler that writes logs as JSON lines for AI parsing.
     Each line is a complete JSON object for easy machine processing.
+    The file is rotated into gzipped segments once it exceeds max_bytes.
+
+    Like logging.FileHandler, the file stays open between records. Writes
+    are buffered and flushed for WARNING+ records, at most flush_interval
+    seconds after the last flush, and on close (logging.shutdown at exit).
     """
-    def __init__(self, filename: Path):
+    def __init__(
+        self,
+        filename: Path,
+        index_filename: Optional[Path] = None,
+        max_bytes: int = 0,
+        backup_count: int = 0,
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 1.0
+    ):
         super().__init__()
         self.filename = filename
+        self.index_filename = index_filename
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.stream = None
+        self.index_stream = None
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def _open(self):
+        self.stream = open(self.filename, 'ab', buffering=self.buffer_size)
+        self._size = self.stream.tell()
+        if self.index_filename:
+            self.index_stream = open(self.index_filename, 'ab', buffering=self.buffer_size)
+
+    def _close_streams(self):
+        # Log file first so flushed index offsets never point past its end
+        for stream in (self.stream, self.index_stream):
+            if stream is not None:
+                stream.close()
+        self.stream = None
+        self.index_stream = None
+
+    def do_rollover(self):
+        """Compress the active file into .1.gz, shifting older segments up"""
+        self._close_streams()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = rotated_segment_path(self.filename, i)
+            if src.exists():
+                src.replace(rotated_segment_path(self.filename, i + 1))
+            if self.index_filename:
+                # Keep each segment paired with its own index (or none)
+                src_index = rotated_index_path(self.index_filename, i)
+                dst_index = rotated_index_path(self.index_filename, i + 1)
+                if src_index.exists():
+                    src_index.replace(dst_index)
+                else:
+                    dst_index.unlink(missing_ok=True)
+        if self.backup_count > 0:
+            with open(self.filename, 'rb') as src, gzip.open(rotated_segment_path(self.filename, 1), 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        self.filename.unlink()
+        # Index offsets refer to the uncompressed file, so the index moves with it
+        if self.index_filename and self.index_filename.exists():
+            if self.backup_count > 0:
+                self.index_filename.replace(rotated_index_path(self.index_filename, 1))
+            else:
+                self.index_filename.unlink()
+
+    def flush(self):
+        self.acquire()
+        try:
+            for stream in (self.stream, self.index_stream):
+                if stream is not None:
+                    stream.flush()
+            self._last_flush = time.monotonic()
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            self._close_streams()
+        finally:
+            self.release()
+        super().close()
 
     def emit(self, record):
         try:
+            # Extras passed via extra= live in the record's __dict__
+            fields = record.__dict__
             log_entry = {
-                "ts": datetime.utcnow().isoformat() + "Z",
-                "unix_ts": record.created,
-                "level": record.levelname,
-                "module": getattr(record, 'module_tag', 'MAIN'),
-                "request_id": getattr(record, 'request_id', None),
-                "logger": record.name,
-                "file": record.filename,
-                "line": record.lineno,
-                "func": record.funcName,
-                "msg": record.getMessage(),
-                # Include extra fields if present
-                "span_id": getattr(record, 'span_id', None),
-                "span_op": getattr(record, 'span_op', None),
-                "duration_ms": getattr(record, 'duration_ms', None),
-                "context": getattr(record, 'log_context', None),
+                "ts": _iso_ts(fields['created']),
+                "unix_ts": fields['created'],
+                "level": fields['levelname'],
+                "module": fields.get('module_tag', 'MAIN'),
             }
+            # Optional fields are only added when set, keeping logs clean
+            if (request_id := fields.get('request_id')) is not None:
+                log_entry["request_id"] = request_id
+            log_entry["logger"] = fields['name']
+            log_entry["file"] = fields['filename']
+            log_entry["line"] = fields['lineno']
+            log_entry["func"] = fields['funcName']
+            log_entry["msg"] = record.getMessage()
+
+            # Include extra fields if present
+            if (span_id := fields.get('span_id')) is not None:
+                log_entry["span_id"] = span_id
+            if (span_op := fields.get('span_op')) is not None:
+                log_entry["span_op"] = span_op
+            if (duration_ms := fields.get('duration_ms')) is not None:
+                log_entry["duration_ms"] = duration_ms
+            if (context := fields.get('log_context')) is not None:
+                log_entry["context"] = context
+            if (span_error := fields.get('span_error')) is not None:
+                log_entry["error"] = span_error
+                log_entry["error_type"] = fields['span_error_type']
 
             # Add exception info if present
             if record.exc_info:
                 log_entry["exception"] = {
                     "type": record.exc_info[0].__name__ if record.exc_info[0] else None,
                     "message": str(record.exc_info[1]) if record.exc_info[1] else None,
-                    "traceback": self.formatException(record.exc_info)
+                    # Reuse the text handlers' formatted traceback when cached
+                    "traceback": record.exc_text or _exception_formatter.formatException(record.exc_info)
                 }
 
-            # Remove None values to keep logs clean
-            log_entry = {k: v for k, v in log_entry.items() if v is not None}
+            data = _json_line(log_entry)
+            if self.stream is None:
+                self._open()
+            if self.max_bytes > 0 and self._size > 0 and self._size + len(data) > self.max_bytes:
+                self.do_rollover()
+                self._open()
+
+            offset = self._size
+            self.stream.write(data)
+            self._size += len(data)
+
+            # Record where this request's line starts for O(hits) trace lookups
+            if self.index_stream and request_id and request_id not in _UNINDEXED_REQUEST_IDS:
+                self.index_stream.write(f"{request_id}\t{offset}\n".encode('utf-8'))
 
-            with open(self.filename, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(log_entry, default=str) + '\n')
+            if record.levelno >= logging.WARNING or time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
 
         except Exception:
             self.handleError(record)
 
 
+class LogQueueHandler(QueueHandler):
+    """
+    Enqueue records for the listener thread instead of writing them.
+
+    Unlike QueueHandler.prepare, the record is not pre-formatted: only the
+    message is rendered now (args may change after the call), while
+    exc_info and extra fields are kept for the JSON handler.
+    """
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class LogQueueListener(QueueListener):
+    """
+    QueueListener that also serves flush requests from flush_logs().
+
+    Buffered handlers are flushed once the queue has been drained, so a
+    burst of records goes out in a few large writes rather than one per
+    record. Under sustained load JSONLineHandler's own flush_interval
+    bounds the delay.
+    """
+    def _flush_handlers(self):
+        for handler in self.handlers:
+            handler.flush()
+
+    def handle(self, record):
+        if isinstance(record, threading.Event):
+            self._flush_handlers()
+            record.set()
+            return
+        super().handle(record)
+        if self.queue.empty():
+            self._flush_handlers()
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def setup_centralized_logging(
     log_level: str = "INFO",
     console_output: bool = True
 ):
     """Setup centralized logging for the entire project"""
-    global _initialized
+    global _initialized, _log_queue, _listener
 
     if _initialized:
         return
@@ -140,16 +366,15 @@ def setup_centralized_logging(
     detailed_formatter = logging.Formatter(DETAILED_FORMAT, datefmt=DATE_FORMAT)
     simple_formatter = logging.Formatter(SIMPLE_FORMAT, datefmt=DATE_FORMAT)
 
-    # Create Request ID filter (applied to all handlers)
-    request_id_filter = RequestIDFilter()
+    # Handlers run in the listener thread, not the thread that logged
+    handlers = []
 
     # 1. Console Handler (for development)
     if console_output:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(numeric_level)
         console_handler.setFormatter(simple_formatter)
-        console_handler.addFilter(request_id_filter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
     # 2. Main Application Log (all modules combined)
     main_handler = TimedRotatingFileHandler(
@@ -162,8 +387,7 @@ def setup_centralized_logging(
     main_handler.suffix = "%Y-%m-%d"
     main_handler.setLevel(logging.INFO)
     main_handler.setFormatter(detailed_formatter)
-    main_handler.addFilter(request_id_filter)
-    root_logger.addHandler(main_handler)
+    handlers.append(main_handler)
 
     # 3. Error Log (all errors from all modules)
     error_handler = TimedRotatingFileHandler(
@@ -176,14 +400,38 @@ def setup_centralized_logging(
     error_handler.suffix = "%Y-%m-%d"
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(detailed_formatter)
-    error_handler.addFilter(request_id_filter)
-    root_logger.addHandler(error_handler)
+    handlers.append(error_handler)
 
     # 4. JSON Line Handler (for AI parsing)
-    json_handler = JSONLineHandler(JSON_LOG_FILE)
+    json_handler = JSONLineHandler(
+        JSON_LOG_FILE,
+        index_filename=JSON_INDEX_FILE,
+        max_bytes=JSON_LOG_MAX_BYTES,
+        backup_count=JSON_LOG_BACKUP_COUNT
+    )
     json_handler.setLevel(logging.INFO)
-    json_handler.addFilter(request_id_filter)
-    root_logger.addHandler(json_handler)
+    handlers.append(json_handler)
+
+    # 5. JSON Error Log (ERROR+ subset of the JSON log)
+    json_error_handler = JSONLineHandler(
+        JSON_ERROR_LOG_FILE,
+        max_bytes=JSON_LOG_MAX_BYTES,
+        backup_count=JSON_LOG_BACKUP_COUNT
+    )
+    json_error_handler.setLevel(logging.ERROR)
+    handlers.append(json_error_handler)
+
+    # Root logger only enqueues. The Request ID filter runs here, in the
+    # calling thread, because the request ID lives in a contextvar.
+    _log_queue = queue.SimpleQueue()
+    queue_handler = LogQueueHandler(_log_queue)
+    queue_handler.addFilter(RequestIDFilter())
+    root_logger.addHandler(queue_handler)
+
+    _listener = LogQueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Runs before logging.shutdown (atexit is LIFO), so queued records are written first
+    atexit.register(_stop_listener)
 
     # Reduce noise from external libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -197,25 +445,18 @@ def setup_centralized_logging(
     print(f"Centralized logging initialized (with AI debug features) | Log directory: {LOG_DIR}")
 
 
+@lru_cache(maxsize=None)
+def _build_logger(name: str, module: str):
+    # Tag via an adapter: the shared logging.getLogger(name) instance gets no
+    # per-module filters, so BACKEND and FRONTEND loggers for one name don't clash
+    return ModuleTagAdapter(logging.getLogger(name), module)
+
+
 def get_logger(name: str, module: str = 'MAIN'):
     """Get a logger instance for a specific module"""
     if not _initialized:
         setup_centralized_logging()
-
-    logger_key = f"{module}:{name}"
-    if logger_key in _loggers:
-        return _loggers[logger_key]
-
-    logger = logging.getLogger(name)
-
-    # Add module tag filter
-    tag_filter = ModuleTagFilter(module)
-    logger.addFilter(tag_filter)
-
-    # Cache logger
-    _loggers[logger_key] = logger
-
-    return logger
+    return _build_logger(name, module)
 
 
 def get_frontend_logger(name: str):
@@ -243,24 +484,26 @@ def log_span(operation: str, logger: Optional[logging.Logger] = None, **context)
     if logger is None:
         logger = get_logger(__name__, module='SPAN')
 
-    span_id = str(uuid.uuid4())[:8]
-    start_time = time.time()
+    span_id = os.urandom(4).hex()
+    start_ns = time.perf_counter_ns()
 
     # Create extra dict for structured logging
     extra = {'span_id': span_id, 'span_op': operation, 'log_context': context if context else None}
 
-    logger.info(f"SPAN_START:{operation} | context={json.dumps(context, default=str)}", extra=extra)
+    # Context is serialized for the text message only when INFO is enabled
+    logger.info("SPAN_START:%s | context=%s", operation, _LazyJSON(context), extra=extra)
 
     try:
         yield span_id
     except Exception as e:
-        duration_ms = (time.time() - start_time) * 1000
+        duration_ms = (time.perf_counter_ns() - start_ns) / 1e6
         extra['duration_ms'] = duration_ms
-        extra['log_context'] = {**context, 'error': str(e), 'error_type': type(e).__name__}
+        extra['span_error'] = str(e)
+        extra['span_error_type'] = type(e).__name__
         logger.error(f"SPAN_ERROR:{operation} | duration={duration_ms:.2f}ms | error={e}", extra=extra)
         raise
     else:
-        duration_ms = (time.time() - start_time) * 1000
+        duration_ms = (time.perf_counter_ns() - start_ns) / 1e6
         extra['duration_ms'] = duration_ms
         logger.info(f"SPAN_END:{operation} | duration={duration_ms:.2f}ms", extra=extra)
 
@@ -291,21 +534,19 @@ def log_exception_context(
     - Local variables from the calling frame (sanitized)
     - Call location
     """
-    # Get the calling frame
-    frame = inspect.currentframe()
-    if frame is not None:
-        frame = frame.f_back
+    # Nothing to capture if the ERROR record would be dropped anyway
+    if not logger.isEnabledFor(logging.ERROR):
+        return
 
-    # Extract local variables (sanitized)
+    # Extract local variables from the calling frame (sanitized)
     locals_safe = {}
-    if include_locals and frame is not None:
-        sensitive_patterns = ['password', 'token', 'key', 'secret', 'credential', 'auth']
-        for k, v in frame.f_locals.items():
+    if include_locals:
+        for k, v in sys._getframe(1).f_locals.items():
             # Skip private/dunder variables
             if k.startswith('_'):
                 continue
             # Skip sensitive data
-            if any(pattern in k.lower() for pattern in sensitive_patterns):
+            if _SENSITIVE_RE.search(k):
                 locals_safe[k] = '[REDACTED]'
                 continue
             # Truncate long representations
@@ -321,19 +562,231 @@ def log_exception_context(
     context = {
         'exception_type': type(exc).__name__,
         'exception_message': str(exc),
-        'locals': locals_safe if locals_safe else None,
-        'traceback': traceback.format_exc()
+        'locals': locals_safe if locals_safe else None
     }
 
-    # Log with extra context
+    # Log with extra context; the handlers format the traceback from exc_info
     extra = {'log_context': context}
     logger.error(
         f"{message} | {type(exc).__name__}: {exc}",
         extra=extra,
-        exc_info=True
+        exc_info=exc
     )
 
 
 def get_json_log_path() -> Path:
     """Return path to JSON log file for external tools"""
     return JSON_LOG_FILE
+
+
+# =============================================================================
+# LOG READING - Efficient tail access for debug tools
+# =============================================================================
+
+def rotated_segment_path(path: Path, number: int) -> Path:
+    """Path of the Nth rotated segment of a JSON log (1 = most recent)"""
+    return path.with_name(f"{path.name}.{number}.gz")
+
+
+def rotated_index_path(path: Path, number: int) -> Path:
+    """Path of the request_id index for the Nth rotated segment"""
+    return path.with_name(f"{path.name}.{number}")
+
+
+def log_segments(path: Path, since: Optional[float] = None):
+    """
+    Yield the active log file, then rotated segments newest to oldest.
+    With since (unix time), stop at the first segment last written before it.
+    """
+    if path.exists():
+        yield path
+    number = 1
+    while (segment := rotated_segment_path(path, number)).exists():
+        if since is not None and segment.stat().st_mtime < since:
+            return
+        yield segment
+        number += 1
+
+
+def json_byte_needle(text: str) -> Optional[bytes]:
+    """
+    Encode a filter value for a raw-line pre-check, or None if the JSON
+    encoding of the value could differ from its literal bytes.
+    """
+    if text.isascii() and text.isprintable() and '"' not in text and '\\' not in text:
+        return text.encode()
+    return None
+
+
+def tail_lines(path: Path, start: int = 0):
+    """
+    Yield raw lines (bytes, newest first) by walking the file backwards.
+
+    The active file is memory-mapped so only the pages for the lines
+    consumed are touched and repeat reads come from the page cache.
+    Lines before byte offset start (a line start) are not read.
+    Gzipped segments are decompressed in full. Stop iterating as soon
+    as you have enough lines.
+    """
+    if path.suffix == '.gz':
+        with gzip.open(path, 'rb') as f:
+            lines = f.read().split(b'\n')
+        for line in reversed(lines):
+            if line:
+                yield line
+        return
+
+    with open(path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            while end > start:
+                line_start = mm.rfind(b'\n', start, end) + 1 or start
+                if line_start < end:
+                    yield mm[line_start:end]
+                end = line_start - 1
+
+
+def bisect_jsonl_by_ts(path: Path, cutoff_ts: str) -> int:
+    """
+    Byte offset of the first line whose "ts" is >= cutoff_ts.
+
+    JSON log lines are appended in time order, so a binary search needs
+    only ~log2(lines) parses instead of a full scan. Unparseable lines
+    near the boundary may be included, so callers should still check ts.
+    """
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            lo, hi = 0, size
+            while lo < hi:
+                mid = (lo + hi) // 2
+                line_start = mm.rfind(b'\n', lo, mid) + 1 or lo
+                # Probe the first parseable line at or after line_start
+                probe, ts = line_start, None
+                while probe < hi:
+                    line_end = mm.find(b'\n', probe)
+                    if line_end == -1:
+                        line_end = size
+                    try:
+                        ts = _json_loads(mm[probe:line_end]).get('ts', '')
+                        break
+                    except (ValueError, AttributeError):
+                        probe = line_end + 1
+                if ts is not None and ts < cutoff_ts:
+                    lo = line_end + 1
+                else:
+                    hi = line_start
+            return min(lo, size)
+
+
+def tail_log_lines(path: Path, since_ts: Optional[str] = None, since: Optional[float] = None):
+    """
+    Yield raw lines newest first across the active file and rotated segments.
+
+    With since_ts (ISO timestamp) the active file is bisected so older
+    lines are never read; rotated segments are only opened when the
+    window reaches back past the start of the active file. since (unix
+    time) skips rotated segments last written before it.
+    """
+    for segment in log_segments(path, since=since):
+        start = 0
+        if since_ts and segment == path:
+            start = bisect_jsonl_by_ts(segment, since_ts)
+        yield from tail_lines(segment, start)
+        if start > 0:
+            return
+
+
+def _indexed_offsets(index_path: Path, needle: bytes) -> list:
+    """Byte offsets (ascending) of records whose request_id contains needle"""
+    offsets = []
+    with open(index_path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return offsets
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = mm.find(needle)
+            while pos != -1:
+                start = mm.rfind(b'\n', 0, pos) + 1
+                end = mm.find(b'\n', pos)
+                if end == -1:
+                    end = len(mm)
+                rid, _, offset = mm[start:end].partition(b'\t')
+                if needle in rid and offset.isdigit():
+                    offsets.append(int(offset))
+                pos = mm.find(needle, end)
+    return offsets
+
+
+def read_request_lines(request_id: str) -> Optional[list]:
+    """
+    Return raw JSON log lines whose request_id contains request_id, using
+    the sidecar index. Returns None if there is no index (caller should
+    fall back to a full scan).
+    """
+    if not JSON_INDEX_FILE.exists() or not JSON_LOG_FILE.exists():
+        return None
+
+    lines = []
+    with open(JSON_LOG_FILE, 'rb') as f:
+        for offset in _indexed_offsets(JSON_INDEX_FILE, request_id.encode()):
+            f.seek(offset)
+            line = f.readline()
+            if line:
+                lines.append(line)
+    return lines
+
+
+def read_rotated_request_lines(request_id: str, found: bool = False) -> list:
+    """
+    Return raw JSON log lines whose request_id contains request_id from
+    rotated segments, oldest first, using the index kept with each segment.
+
+    Only segments whose index has hits are decompressed. A request's
+    records are contiguous in time, so once matches have been found (pass
+    found=True if the active file had some), the first segment without any
+    ends the search. Segments rotated without an index are not searched.
+    """
+    needle = request_id.encode()
+    lines = []
+    number = 1
+    while (segment := rotated_segment_path(JSON_LOG_FILE, number)).exists():
+        index_path = rotated_index_path(JSON_INDEX_FILE, number)
+        number += 1
+        if not index_path.exists():
+            continue
+        offsets = _indexed_offsets(index_path, needle)
+        if not offsets:
+            if found:
+                break
+            continue
+        found = True
+        hits = []
+        try:
+            with gzip.open(segment, 'rb') as f:
+                # Offsets ascend, so each seek only decompresses forward
+                for offset in offsets:
+                    f.seek(offset)
+                    line = f.readline()
+                    if line:
+                        hits.append(line)
+        except (OSError, EOFError):
+            # Being written by a rollover right now
+            continue
+        lines = hits + lines
+    return lines
+
+
+def flush_logs(timeout: float = 5.0):
+    """Write queued and buffered records so readers in this process see them"""
+    if _listener is None:
+        for handler in logging.getLogger().handlers:
+            handler.flush()
+        return
+    # Processed after every record queued before it
+    flushed = threading.Event()
+    _log_queue.put(flushed)
+    flushed.wait(timeout)